@@ -0,0 +1,268 @@
+""" (script) bench
+This script benchmarks the parse and render functions using synthetic data
+so it can be run offline, it records timings and peak memory to a baseline file
+and can compare against that baseline to catch performance regressions
+
+Usage:
+    python benchmarks/bench.py run --save       # record a baseline
+    python benchmarks/bench.py compare          # fails if something got slower
+"""
+
+import io
+import os
+import sys
+import json
+import platform
+import tempfile
+import tracemalloc
+from timeit import Timer
+from statistics import median
+from datetime import datetime
+from contextlib import redirect_stdout
+from typing import Callable, Optional
+
+import typer
+from rich import print
+from rich.table import Table
+from rich.markup import escape
+from rich.console import Console
+
+# let the script be run from a checkout without installing the package,
+# the synthetic data generators are shared with the tests
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "tests"))
+
+import synthetic
+from kmrpp.core.parse import (
+    parse_timetable,
+    parse_calendar,
+    timetable_to_table,
+    timetable_to_weeks,
+)
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+WEEK_DATES = {
+    "Monday": "2023-02-06",
+    "Tuesday": "2023-02-07",
+    "Wednesday": "2023-02-08",
+    "Thursday": "2023-02-09",
+    "Friday": "2023-02-10",
+}
+
+
+def bench_timetable_to_weeks(
+    weeks: int, periods: int, students: int = 1
+) -> Callable[[], object]:
+    period_data = synthetic.period_data(periods)
+    timetables = [
+        synthetic.timetable_data(weeks, periods, seed=seed) for seed in range(students)
+    ]
+
+    def run():
+        for timetable_data in timetables:
+            timetable_to_weeks(timetable_data, period_data)
+
+    return run
+
+
+def bench_parse_timetable(cache_dir: str) -> Callable[[], object]:
+    period_data = synthetic.period_data()
+    timetable_data = synthetic.timetable_data()
+    return lambda: parse_timetable(timetable_data, period_data, cache_dir)
+
+
+def bench_parse_calendar(cache_dir: str, years: int) -> Callable[[], object]:
+    calendar_data = synthetic.calendar_data(2023, years)
+    return lambda: parse_calendar(calendar_data, cache_dir)
+
+
+def bench_timetable_to_table(periods: int) -> Callable[[], object]:
+    weeks = timetable_to_weeks(
+        synthetic.timetable_data(1, periods), synthetic.period_data(periods)
+    )
+    week_data = weeks[0].dict()
+
+    def run():
+        table = timetable_to_table(week_data, 1, WEEK_DATES)
+        Console(file=io.StringIO(), width=120).print(table)
+
+    return run
+
+
+# each benchmark gets a cache dir and returns the function to time
+# the timetable_to_weeks ones are the xml -> Week conversion on its own,
+# parse_timetable also includes writing the json/binary cache files
+BENCHMARKS: dict[str, Callable[[str], Callable[[], object]]] = {
+    "timetable_to_weeks[realistic]": lambda d: bench_timetable_to_weeks(40, 9),
+    "timetable_to_weeks[scaled]": lambda d: bench_timetable_to_weeks(200, 16),
+    "timetable_to_weeks[students]": lambda d: bench_timetable_to_weeks(40, 9, 30),
+    "parse_timetable[realistic]": lambda d: bench_parse_timetable(d),
+    "parse_calendar[realistic]": lambda d: bench_parse_calendar(d, 1),
+    "parse_calendar[scaled]": lambda d: bench_parse_calendar(d, 10),
+    "timetable_to_table[realistic]": lambda d: bench_timetable_to_table(9),
+    "timetable_to_table[scaled]": lambda d: bench_timetable_to_table(24),
+}
+
+
+def measure(
+    func: Callable[[], object], repeat: int, loops: Optional[int] = None
+) -> dict:
+    """
+    Time a function and measure its peak memory
+
+    Each sample times a loop of calls so that a single slow call doesn't skew it,
+    if loops isn't given it is picked so each sample takes at least 0.2 seconds.
+    Peak memory is measured in a separate call because tracemalloc slows things down
+
+    Returns:
+        dict: The min/median time per call in seconds, the loops per sample
+            and the peak memory in bytes
+    """
+    timer = Timer(func)
+    with redirect_stdout(io.StringIO()):
+        func()  # warm up
+
+        if loops is None:
+            loops, _ = timer.autorange()
+        times = [total / loops for total in timer.repeat(repeat=repeat, number=loops)]
+
+        tracemalloc.start()
+        func()
+        _, peak_memory = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    return {
+        "min": min(times),
+        "median": median(times),
+        "loops": loops,
+        "peak_memory": peak_memory,
+    }
+
+
+def run_benchmarks(
+    repeat: int, only: Optional[str] = None, baseline: Optional[dict] = None
+) -> dict[str, dict]:
+    """
+    Run all the benchmarks (or the ones with `only` in their name)
+
+    Parameters:
+        baseline (Optional[dict]): If given the loop counts from it are reused
+            so the results can be compared fairly
+    Returns:
+        dict[str, dict]: The results for each benchmark
+    """
+    baseline = {} if baseline is None else baseline
+    results = {}
+    with tempfile.TemporaryDirectory() as cache_dir:
+        for name, setup in BENCHMARKS.items():
+            if only is not None and only not in name:
+                continue
+            print(f"[b green]✓ Running {escape(name)}...")
+            loops = baseline.get(name, {}).get("loops")
+            results[name] = measure(setup(cache_dir), repeat, loops)
+    return results
+
+
+def results_table(results: dict[str, dict]) -> Table:
+    table = Table(title="[bold blue]Benchmark Results")
+    table.add_column("Benchmark")
+    table.add_column("Min (ms)", justify="right")
+    table.add_column("Median (ms)", justify="right")
+    table.add_column("Loops", justify="right")
+    table.add_column("Peak Memory (KiB)", justify="right")
+    for name, result in results.items():
+        table.add_row(
+            escape(name),
+            f"{result['min'] * 1000:.2f}",
+            f"{result['median'] * 1000:.2f}",
+            str(result["loops"]),
+            f"{result['peak_memory'] / 1024:.1f}",
+        )
+    return table
+
+
+app = typer.Typer()
+
+
+@app.command(help="Run the benchmarks and optionally save the results as the baseline")
+def run(
+    save: bool = typer.Option(False, help="Save the results to the baseline file"),
+    baseline: str = typer.Option(BASELINE_PATH, help="The baseline file to use"),
+    repeat: int = typer.Option(10, help="How many samples to take of each benchmark"),
+    only: str = typer.Option(None, help="Only run benchmarks with this in their name"),
+):
+    results = run_benchmarks(repeat, only)
+    print(results_table(results))
+
+    if save:
+        data = {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "machine": platform.platform(),
+            "results": results,
+        }
+        with open(baseline, "w") as f:
+            json.dump(data, f, indent=4)
+        print(f"[green]Baseline saved to: {baseline}")
+
+
+@app.command(help="Run the benchmarks and fail if any regressed against the baseline")
+def compare(
+    baseline: str = typer.Option(BASELINE_PATH, help="The baseline file to use"),
+    threshold: float = typer.Option(
+        0.25, help="How much slower (as a fraction) a benchmark can get before failing"
+    ),
+    memory_threshold: float = typer.Option(
+        0.25, help="How much more memory (as a fraction) a benchmark can use"
+    ),
+    repeat: int = typer.Option(10, help="How many samples to take of each benchmark"),
+    only: str = typer.Option(None, help="Only run benchmarks with this in their name"),
+):
+    if not os.path.exists(baseline):
+        print(f"[bold red]No baseline found at {baseline}, run with `run --save` first")
+        raise typer.Exit(1)
+
+    with open(baseline) as f:
+        baseline_results = json.load(f)["results"]
+
+    results = run_benchmarks(repeat, only, baseline_results)
+
+    table = Table(title="[bold blue]Benchmark Comparison")
+    table.add_column("Benchmark")
+    table.add_column("Time (ms)", justify="right")
+    table.add_column("Change", justify="right")
+    table.add_column("Peak Memory (KiB)", justify="right")
+    table.add_column("Change", justify="right")
+
+    regressions = []
+    for name, result in results.items():
+        if (old := baseline_results.get(name)) is None:
+            table.add_row(escape(name), f"{result['min'] * 1000:.2f}", "new", "", "")
+            continue
+
+        # min is used for time because it is the least affected by noise
+        time_change = result["min"] / old["min"] - 1
+        memory_change = result["peak_memory"] / max(old["peak_memory"], 1) - 1
+
+        time_color = "red" if time_change > threshold else "green"
+        memory_color = "red" if memory_change > memory_threshold else "green"
+        if time_change > threshold or memory_change > memory_threshold:
+            regressions.append(name)
+
+        table.add_row(
+            escape(name),
+            f"{result['min'] * 1000:.2f}",
+            f"[{time_color}]{time_change:+.1%}",
+            f"{result['peak_memory'] / 1024:.1f}",
+            f"[{memory_color}]{memory_change:+.1%}",
+        )
+
+    print(table)
+    if regressions:
+        print(f"[bold red]Regressed: {escape(', '.join(regressions))}")
+        raise typer.Exit(1)
+    print("[bold green]No regressions found")
+
+
+if __name__ == "__main__":
+    app()
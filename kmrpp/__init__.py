@@ -6,14 +6,36 @@ __all__ = (
     "parse_calendar",
     "parse_periods",
     "parse_timetable",
+    "timetable_to_weeks",
     "Day",
     "Period",
     "Week",
+    "ScheduledDay",
     "CACHE_DIR",
+    "TimetableStore",
+    "InvalidCacheFile",
+    "InvalidCachePath",
+    "ScheduleIndex",
+    "iter_ics",
+    "write_ics",
 )
 
-from .core.exceptions import FailedToLogin, NoLoginDetails, FailedToFetch
+from .core.exceptions import (
+    FailedToLogin,
+    NoLoginDetails,
+    FailedToFetch,
+    InvalidCacheFile,
+    InvalidCachePath,
+)
 from .core.http import ParentPortal
-from .core.parse import parse_calendar, parse_periods, parse_timetable
-from .core.models import Day, Period, Week
+from .core.parse import (
+    parse_calendar,
+    parse_periods,
+    parse_timetable,
+    timetable_to_weeks,
+)
+from .core.models import Day, Period, Week, ScheduledDay
 from .core.consts import CACHE_DIR
+from .core.store import TimetableStore
+from .core.query import ScheduleIndex
+from .core.ics import iter_ics, write_ics
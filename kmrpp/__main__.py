@@ -4,29 +4,39 @@ This is the script that runs the cli
 
 import os
 import json
-from datetime import datetime
+from typing import Optional
+from datetime import datetime, date, timedelta
 
 import typer
+from typer.models import OptionInfo
 from rich import print
 from rich.json import JSON
 from dotenv import load_dotenv
 
 from kmrpp.core.models import Weekdays
-from kmrpp.core.consts import CACHE_DIR
 from kmrpp.core.http import ParentPortal
-from kmrpp.core.exceptions import NoLoginDetails
-from kmrpp.core.parse import parse_timetable, timetable_to_table, parse_calendar
+from kmrpp.core.ics import write_ics
+from kmrpp.core.query import ScheduleIndex
+from kmrpp.core.store import TimetableStore
+from kmrpp.core.exceptions import NoLoginDetails, InvalidCacheFile
+from kmrpp.core.consts import current_year, default_grid, get_partition_dir
+from kmrpp.core.parse import (
+    parse_timetable,
+    timetable_to_table,
+    schedule_to_table,
+    parse_calendar,
+)
 
 
 load_dotenv()
 
 
-def get_portal() -> ParentPortal:
+def get_login_details() -> tuple[str, str]:
     """
-    Get login details and use them to return the ParentPortal singleton object
+    Get the login details from the environment
 
     Returns:
-        ParentPortal: The object used to carry out http requets to the api
+        tuple[str, str]: The username and password
     Raises:
         NoLoginDetails: If login details are not found
     """
@@ -36,7 +46,76 @@ def get_portal() -> ParentPortal:
 
     if username is None or password is None:
         raise NoLoginDetails
-    return ParentPortal(username, password)
+    return username, password
+
+
+def get_portal() -> ParentPortal:
+    """
+    Get login details and use them to return the ParentPortal singleton object
+
+    Returns:
+        ParentPortal: The object used to carry out http requets to the api
+    Raises:
+        NoLoginDetails: If login details are not found
+    """
+
+    return ParentPortal(*get_login_details())
+
+
+def load_timetable(year: int, grid: str, cache: bool = True) -> TimetableStore:
+    """
+    Open the memory mapped timetable store for a year/grid from the cache
+    If it isn't cached, is invalid or cache is False it will be fetched and parsed first
+
+    Returns:
+        TimetableStore: The timetable store, this should be closed after use
+    """
+
+    username, _ = get_login_details()
+    cache_dir = get_partition_dir(username, year, grid)
+    path = os.path.join(cache_dir, "timetable.bin")
+
+    if os.path.exists(path) and cache:
+        try:
+            return TimetableStore(path)
+        except InvalidCacheFile:
+            pass
+
+    portal = get_portal()
+    timetable_data = portal.timetable(cache, year, grid)
+    period_data = portal.periods(cache)
+    parse_timetable(timetable_data, period_data, cache_dir)
+
+    return TimetableStore(path)
+
+
+def load_calendar(year: int, cache: bool = True) -> dict:
+    """
+    Load the parsed calendar for a year from the cache
+    If it isn't cached (or cache is False) it will be fetched and parsed first
+
+    Returns:
+        dict: The calendar json data
+    """
+
+    username, _ = get_login_details()
+    cache_dir = get_partition_dir(username, year)
+    path = os.path.join(cache_dir, "calendar.json")
+
+    if not os.path.exists(path) or not cache:
+        portal = get_portal()
+        parse_calendar(portal.calendar(cache, year), cache_dir)
+
+    with open(path) as f:
+        return json.load(f)
+
+
+def year_option() -> OptionInfo:
+    return typer.Option(None, help="The year to use, defaults to the current year")
+
+
+def grid_option() -> OptionInfo:
+    return typer.Option(None, help="The timetable grid to use, defaults to '<year>TT'")
 
 
 app = typer.Typer()
@@ -48,14 +127,21 @@ app = typer.Typer()
     hidden=True,
     help="Convert entire terminal to json and give link to file (alias: 'ttjson')",
 )
-def timetable_to_json():
+def timetable_to_json(
+    year: Optional[int] = year_option(),
+    grid: Optional[str] = grid_option(),
+):
+    year = current_year() if year is None else year
+    grid = default_grid(year) if grid is None else grid
+
     portal = get_portal()
-    timetable_data = portal.timetable()
+    timetable_data = portal.timetable(year=year, grid=grid)
     period_data = portal.periods()
-    parse_timetable(timetable_data, period_data)
+    cache_dir = portal.cache_dir(year, grid)
+    parse_timetable(timetable_data, period_data, cache_dir)
 
     print(
-        f"[green]Timetable converted to json and saved to: {os.path.join(CACHE_DIR, 'timetable.json')} :tick:"
+        f"[green]Timetable converted to json and saved to: {os.path.join(cache_dir, 'timetable.json')} :tick:"
     )
 
 
@@ -72,27 +158,22 @@ def timetable_json(
     cache: bool = typer.Option(
         True, help="If set to true, it will refetch data instead of using cache"
     ),
+    year: Optional[int] = year_option(),
+    grid: Optional[str] = grid_option(),
 ):
-    print(f"[bold blue]Showing timetable for W{week}:")
+    year = current_year() if year is None else year
+    grid = default_grid(year) if grid is None else grid
+    print(f"[bold blue]Showing timetable for W{week} ({grid}):")
 
-    path = os.path.join(CACHE_DIR, "timetable.json")
-    if not os.path.exists(path) or cache is False:
-        portal = get_portal()
-        timetable_data = portal.timetable(cache)
-        period_data = portal.periods(cache)
-        parse_timetable(timetable_data, period_data)
-
-    with open(path) as f:
-        data = json.load(f)
+    with load_timetable(year, grid, cache) as store:
+        if day is None:
+            data = store.week(week)
+        else:
+            data = store.day(week, day.value)
 
-    try:
-        week_data = data[f"W{week}"]
-    except KeyError:
+    if data is None:
         return print(f"[bold red]Timetable data for week {week} was not found")
-
-    if day is None:
-        return print(JSON(json.dumps(week_data)))
-    print(JSON(json.dumps(week_data["days"][day.value])))
+    print(JSON(json.dumps(data)))
 
 
 @app.command("tt", hidden=True, help="Alias for the 'timetable' command")
@@ -104,24 +185,13 @@ def timetable_table(
     cache: bool = typer.Option(
         True, help="If this option is used it will refetch data instead of using cache"
     ),
+    year: Optional[int] = year_option(),
+    grid: Optional[str] = grid_option(),
 ):
-    timetable_path = os.path.join(CACHE_DIR, "timetable.json")
-    portal = get_portal()
-    if not os.path.exists(timetable_path) or not cache:
-        timetable_data = portal.timetable(cache)
-        period_data = portal.periods(cache)
-        parse_timetable(timetable_data, period_data)
-
-    with open(timetable_path) as f:
-        timetable_data = json.load(f)
+    year = current_year() if year is None else year
+    grid = default_grid(year) if grid is None else grid
 
-    calendar_path = os.path.join(CACHE_DIR, "calendar.json")
-    if not os.path.exists(calendar_path) or not cache:
-        calendar_data = portal.calendar(cache)
-        parse_calendar(calendar_data)
-
-    with open(calendar_path) as f:
-        calendar_data = json.load(f)
+    calendar_data = load_calendar(year, cache)
 
     if week is None:
         today = datetime.today()
@@ -133,16 +203,12 @@ def timetable_table(
             )
         week = day_data["week"]
 
-    try:
-        week_data = timetable_data[f"W{week}"]
-    except KeyError:
-        return print(f"[bold red]Timetable data for week {week} was not found")
-    try:
-        calendar_data = calendar_data["weeks"][str(week)]
-    except KeyError:
+    with load_timetable(year, grid, cache) as store:
+        week_data = store.week(int(week))
+        dates = ScheduleIndex(store, calendar_data).week_dates.get(int(week))
+    if week_data is None or dates is None:
         return print(f"[bold red]Timetable data for week {week} was not found")
 
-    dates = [i["date"] for i in calendar_data][1:-1]
     table = timetable_to_table(week_data, week, dates)
     print(table)
     print(
@@ -150,6 +216,100 @@ def timetable_table(
     )
 
 
+@app.command("r", hidden=True, help="Alias for the 'range' command")
+@app.command("range", help="View your timetable for a range of dates (alias: 'r')")
+def timetable_range(
+    start: datetime = typer.Option(
+        None, "--from", formats=["%Y-%m-%d"], help="The first date, defaults to today"
+    ),
+    end: datetime = typer.Option(
+        None,
+        "--to",
+        formats=["%Y-%m-%d"],
+        help="The last date, if not given the '--days' option is used",
+    ),
+    days: int = typer.Option(
+        7, min=1, help="The number of days to show if '--to' isn't given"
+    ),
+    cache: bool = typer.Option(
+        True, help="If this option is used it will refetch data instead of using cache"
+    ),
+    grid: Optional[str] = grid_option(),
+):
+    start_date = date.today() if start is None else start.date()
+    end_date = start_date + timedelta(days=days - 1) if end is None else end.date()
+    if end_date < start_date:
+        return print("[bold red]The '--to' date must not be before the '--from' date")
+
+    # login first so only the fetches for each year are skipped if they fail below
+    get_portal()
+
+    # the calendar/timetable are per year so ranges over new year use both years
+    schedule = []
+    found_years = 0
+    for year in range(start_date.year, end_date.year + 1):
+        year_grid = default_grid(year) if grid is None else grid
+        try:
+            calendar_data = load_calendar(year, cache)
+            store = load_timetable(year, year_grid, cache)
+        except SystemExit:
+            # FailedToFetch has already shown the error and exits, eg next year's
+            # data isn't published yet, so skip the year and show the rest
+            if start_date.year == end_date.year:
+                raise
+            print(f"[bold yellow]Skipping {year}, data for {year} could not be fetched")
+            continue
+
+        found_years += 1
+        with store:
+            index = ScheduleIndex(store, calendar_data)
+            year_start = max(start_date, date(year, 1, 1))
+            year_end = min(end_date, date(year, 12, 31))
+            schedule.extend(index.range(year_start, year_end))
+
+    if found_years == 0:
+        raise typer.Exit(1)
+    print(schedule_to_table(schedule, f"Timetable - {start_date} to {end_date}"))
+
+
+@app.command("ics", help="Export your timetable to an iCalendar (.ics) file")
+def timetable_ics(
+    output: str = typer.Option(
+        "timetable.ics", help="The path to save the .ics file to"
+    ),
+    start: datetime = typer.Option(
+        None,
+        "--from",
+        formats=["%Y-%m-%d"],
+        help="The first date to export, defaults to the start of the year",
+    ),
+    end: datetime = typer.Option(
+        None,
+        "--to",
+        formats=["%Y-%m-%d"],
+        help="The last date to export, defaults to the end of the year",
+    ),
+    cache: bool = typer.Option(
+        True, help="If this option is used it will refetch data instead of using cache"
+    ),
+    year: Optional[int] = year_option(),
+    grid: Optional[str] = grid_option(),
+):
+    year = current_year() if year is None else year
+    grid = default_grid(year) if grid is None else grid
+    start_date = date(year, 1, 1) if start is None else start.date()
+    end_date = date(year, 12, 31) if end is None else end.date()
+
+    username, _ = get_login_details()
+    calendar_data = load_calendar(year, cache)
+    with load_timetable(year, grid, cache) as store:
+        index = ScheduleIndex(store, calendar_data)
+        schedule = index.iter_range(start_date, end_date)
+        write_ics(output, schedule, username, f"Timetable ({grid})")
+
+    print(f"[bold green]Timetable exported to: {os.path.abspath(output)}")
+
+
 @app.command("l", hidden=True, help="Alias for the 'login' command")
 @app.command(help="Command to log you into parent portal (alias: 'l')")
 def login(
@@ -177,15 +337,20 @@ def login(
 
 
 @app.command("reset-cache", help="Command to quickly reset the cache")
-def reset_cache():
+def reset_cache(
+    year: Optional[int] = year_option(),
+    grid: Optional[str] = grid_option(),
+):
+    year = current_year() if year is None else year
+    grid = default_grid(year) if grid is None else grid
     portal = get_portal()
 
-    timetable_data = portal.timetable(use_cache=False)
+    timetable_data = portal.timetable(use_cache=False, year=year, grid=grid)
     period_data = portal.periods(use_cache=False)
-    calendar_data = portal.calendar(use_cache=False)
+    calendar_data = portal.calendar(use_cache=False, year=year)
 
-    parse_timetable(timetable_data, period_data)
-    parse_calendar(calendar_data)
+    parse_timetable(timetable_data, period_data, portal.cache_dir(year, grid))
+    parse_calendar(calendar_data, portal.cache_dir(year))
 
 
 def main():
@@ -3,6 +3,10 @@ This module contains some constant values that are used in other files
 """
 
 import os
+from datetime import date
+from typing import Optional
+
+from kmrpp.core.exceptions import InvalidCachePath
 
 BASE_URL = "https://parentportal.ormiston.school.nz/api/api.php"
 DEFAULT_HEADERS = {
@@ -13,3 +17,75 @@ DEFAULT_HEADERS = {
 CACHE_DIR = os.path.join(os.path.dirname(__file__), "cache")
 if not os.path.exists(CACHE_DIR):
     os.mkdir(CACHE_DIR)
+
+
+def current_year() -> int:
+    """
+    Get the current year, this is worked out on every call so that
+    long running processes don't get stuck on the year they were started in
+
+    Returns:
+        int: The current year
+    """
+    return date.today().year
+
+
+def default_grid(year: int) -> str:
+    """
+    Get the name of the default timetable grid for a year
+
+    Returns:
+        str: The grid name eg "2023TT"
+    """
+    return f"{year}TT"
+
+
+def get_cache_dir(*parts: str) -> str:
+    """
+    Get (and create if it doesn't exist) a partition of the cache dir
+    The cache is partitioned by account, year and grid so that data for
+    different years/grids doesn't overwrite each other
+
+    Example:
+        get_cache_dir("st22209", "2023", "2023TT") -> "<CACHE_DIR>/st22209/2023/2023TT"
+
+    Returns:
+        str: The path to the cache directory
+    Raises:
+        InvalidCachePath: If a part could escape the cache dir (eg "../x")
+    """
+    parts = tuple(map(str, parts))
+    for part in parts:
+        if (
+            part in ("", ".")
+            or ".." in part
+            or os.sep in part
+            or (os.altsep is not None and os.altsep in part)
+        ):
+            raise InvalidCachePath(part)
+
+    path = os.path.join(CACHE_DIR, *parts)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def get_partition_dir(
+    username: str, year: Optional[int] = None, grid: Optional[str] = None
+) -> str:
+    """
+    Get (and create if it doesn't exist) the cache dir for an account's data
+    This is the one place the <account>/<year>/<grid> layout is defined
+
+    Parameters:
+        username (str): The account the data belongs to
+        year (Optional[int]): If given the path will be for that year's partition
+        grid (Optional[str]): If given (with year) the path will be for that grid's partition
+    Returns:
+        str: The path to the cache directory
+    """
+    parts = [username]
+    if year is not None:
+        parts.append(str(year))
+        if grid is not None:
+            parts.append(grid)
+    return get_cache_dir(*parts)
@@ -4,6 +4,7 @@ This module contains exceptions that will be raised by the app
 
 from rich.text import Text
 from rich.panel import Panel
+from rich.markup import escape
 from rich.console import Console
 
 
@@ -63,3 +64,25 @@ class FailedToFetch(RichBaseException):
             f"Failed To Get {thing}!",
             f"{thing} could not be fetched for unknown reasons",
         )
+
+
+class InvalidCachePath(RichBaseException):
+    """
+    Raised when part of a cache path (eg the grid or username) isn't a plain name
+    """
+
+    def __init__(self, part: str) -> None:
+        super().__init__(
+            "Invalid Cache Path!",
+            f"'{escape(part)}' can't be used in a cache path, it must be a name without '/', '\\' or '..'",
+        )
+
+
+class InvalidCacheFile(BaseException):
+    """
+    Raised when a cache file is not in the expected format
+    This isn't a rich exception because it can be handled by refetching the data
+    """
+
+    def __init__(self, path: str) -> None:
+        super().__init__(f"Invalid cache file: {path}")
@@ -3,7 +3,6 @@ This module contains the ParentPortal class which is responsible for making requ
 """
 
 import os
-from datetime import date
 from typing import Optional
 import xml.etree.ElementTree as ET
 
@@ -11,9 +10,13 @@ import requests
 from rich import print
 
 from kmrpp.core.exceptions import FailedToLogin, FailedToFetch
-from kmrpp.core.consts import BASE_URL, DEFAULT_HEADERS, CACHE_DIR
-
-YEAR = date.today().year
+from kmrpp.core.consts import (
+    BASE_URL,
+    DEFAULT_HEADERS,
+    current_year,
+    default_grid,
+    get_partition_dir,
+)
 
 
 class Singleton(type):
@@ -42,13 +45,33 @@ class ParentPortal(metaclass=Singleton):
         self.api_url = BASE_URL if url is None else url
         self.key = self.__login() if key is None else key
 
-    def timetable(self, use_cache: bool = True) -> ET.Element:
+    def cache_dir(self, year: Optional[int] = None, grid: Optional[str] = None) -> str:
+        """
+        Get the cache directory for this account
+
+        Parameters:
+            year (Optional[int]): If given the path will be for that year's partition
+            grid (Optional[str]): If given (with year) the path will be for that grid's partition
+        Returns:
+            str: The path to the cache directory
+        """
+
+        return get_partition_dir(self.username, year, grid)
+
+    def timetable(
+        self,
+        use_cache: bool = True,
+        year: Optional[int] = None,
+        grid: Optional[str] = None,
+    ) -> ET.Element:
         """
         Get timetable data from api
 
         Parameters:
             use_cache (bool): If set to false it will fetch data from the api
                 if set to true (which is the default) it will use the cached data instead (if cache exists)
+            year (Optional[int]): The year to get the timetable for, defaults to the current year
+            grid (Optional[str]): The timetable grid to use, defaults to "<year>TT"
         Returns:
             xml.etree.ElementTree.Element: An xml element of the data returned from the api
 
@@ -56,19 +79,22 @@ class ParentPortal(metaclass=Singleton):
             FailedToFetch: If it was unable to get the data
         """
 
-        cache_path = os.path.join(CACHE_DIR, "timetable.xml")
+        year = current_year() if year is None else year
+        grid = default_grid(year) if grid is None else grid
+        cache_path = os.path.join(self.cache_dir(year, grid), "timetable.xml")
 
+        response_text = None
         if use_cache and os.path.exists(cache_path):
-            print("[b green]✓ Using cached timetable...")
+            print(f"[b green]✓ Using cached timetable ({grid})...")
             tree = ET.parse(cache_path)
             timetable_response_parsed = tree.getroot()
         else:
-            print("[b green]✓ Fetching timetable...")
+            print(f"[b green]✓ Fetching timetable ({grid})...")
             data = {
                 "Command": "GetStudentTimetable",
                 "Key": self.key,
                 "StudentID": self.username,
-                "Grid": f"{YEAR}TT",
+                "Grid": grid,
             }
 
             timetable_response = requests.post(
@@ -77,17 +103,20 @@ class ParentPortal(metaclass=Singleton):
             if timetable_response.status_code != 200:
                 raise FailedToFetch("Timetable")
 
-            timetable_response_parsed = ET.fromstring(timetable_response.text)
-
-            # cache timetable for future
-            with open(cache_path, "w") as f:
-                f.write(timetable_response.text)
+            response_text = timetable_response.text
+            timetable_response_parsed = ET.fromstring(response_text)
 
-        if (students_tag := timetable_response_parsed.find("Students")) is None:
+        students_tag = timetable_response_parsed.find("Students")
+        if students_tag is None or len(students_tag) == 0:
             raise FailedToFetch("Timetable")
         if (timetable_data := students_tag[0].find("TimetableData")) is None:
             raise FailedToFetch("Timetable")
 
+        # only cache valid responses so a bad year/grid isn't stuck in the cache
+        if response_text is not None:
+            with open(cache_path, "w") as f:
+                f.write(response_text)
+
         return timetable_data
 
     def periods(self, use_cache: bool = True) -> ET.Element:
@@ -104,7 +133,8 @@ class ParentPortal(metaclass=Singleton):
             FailedToFetch: If it was unable to get the data
         """
 
-        cache_path = os.path.join(CACHE_DIR, "periods.xml")
+        cache_path = os.path.join(self.cache_dir(), "periods.xml")
+        response_text = None
         if use_cache and os.path.exists(cache_path):
             print("[b green]✓ Using cached periods...")
             tree = ET.parse(cache_path)
@@ -122,23 +152,28 @@ class ParentPortal(metaclass=Singleton):
             if periods_response.status_code != 200:
                 raise FailedToFetch("Periods")
 
-            periods_parsed = ET.fromstring(periods_response.text)
-
-            with open(cache_path, "w") as f:
-                f.write(periods_response.text)
+            response_text = periods_response.text
+            periods_parsed = ET.fromstring(response_text)
 
         if (start_times := periods_parsed.find("StartTimes")) is None:
             raise FailedToFetch("Periods")
 
+        if response_text is not None:
+            with open(cache_path, "w") as f:
+                f.write(response_text)
+
         return start_times
 
-    def calendar(self, use_cache: bool = True) -> ET.Element:
+    def calendar(
+        self, use_cache: bool = True, year: Optional[int] = None
+    ) -> ET.Element:
         """
         Get calendar data from api
 
         Parameters:
             use_cache (bool): If set to false it will fetch data from the api
                 if set to true (which is the default) it will use the cached data instead (if cache exists)
+            year (Optional[int]): The year to get the calendar for, defaults to the current year
         Returns:
             xml.etree.ElementTree.Element: An xml element of the data returned from the api
 
@@ -146,17 +181,19 @@ class ParentPortal(metaclass=Singleton):
             FailedToFetch: If it was unable to get the data
         """
 
-        cache_path = os.path.join(CACHE_DIR, "calendar.xml")
+        year = current_year() if year is None else year
+        cache_path = os.path.join(self.cache_dir(year), "calendar.xml")
+        response_text = None
         if use_cache and os.path.exists(cache_path):
-            print("[b green]✓ Using cached calendar...")
+            print(f"[b green]✓ Using cached calendar ({year})...")
             tree = ET.parse(cache_path)
             calendar_parsed = tree.getroot()
         else:
-            print("[b green]✓ Fetching calendar...")
+            print(f"[b green]✓ Fetching calendar ({year})...")
             data = {
                 "Command": "GetCalendar",
                 "Key": self.key,
-                "Year": YEAR,
+                "Year": year,
             }
 
             calendar_response = requests.post(
@@ -165,14 +202,16 @@ class ParentPortal(metaclass=Singleton):
             if calendar_response.status_code != 200:
                 raise FailedToFetch("Calendar")
 
-            calendar_parsed = ET.fromstring(calendar_response.text)
-
-            with open(cache_path, "w") as f:
-                f.write(calendar_response.text)
+            response_text = calendar_response.text
+            calendar_parsed = ET.fromstring(response_text)
 
         if (days := calendar_parsed.find("Days")) is None:
             raise FailedToFetch("Calendar")
 
+        if response_text is not None:
+            with open(cache_path, "w") as f:
+                f.write(response_text)
+
         return days
 
     def __login(self) -> str:
@@ -0,0 +1,161 @@
+""" (module) ics
+This module contains functions to export the timetable as an iCalendar (.ics) file
+
+Everything here is a generator so events are written out as they are made,
+this means exporting a whole year (or many students) doesn't build the file in memory
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, Iterator
+
+from kmrpp.core.models import ScheduledDay
+from kmrpp.core.parse import parse_class_name
+
+# the assumed length of the last period of the day, there is no next period to end it
+DEFAULT_PERIOD_LENGTH = timedelta(hours=1)
+
+
+def escape_text(text: str) -> str:
+    """
+    Escape a value so it can be used as ics text
+
+    Returns:
+        str: The escaped text
+    """
+    return (
+        text.replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\n", "\\n")
+    )
+
+
+def fold_line(line: str) -> str:
+    """
+    Fold a content line so that no line is longer than 75 octets (RFC 5545 3.1)
+
+    Returns:
+        str: The folded line ending in CRLF
+    """
+    if len(line.encode()) <= 75:
+        return f"{line}\r\n"
+
+    parts = []
+    current = ""
+    current_length = 0
+    limit = 75
+    for char in line:
+        char_length = len(char.encode())
+        if current_length + char_length > limit:
+            parts.append(current)
+            # continuation lines start with a space which counts towards the limit
+            current, current_length, limit = "", 0, 74
+        current += char
+        current_length += char_length
+    parts.append(current)
+
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def iter_ics_events(
+    schedule: Iterable[ScheduledDay], uid_prefix: str, stamp: datetime
+) -> Iterator[str]:
+    """
+    Generate VEVENTs for every class in the schedule
+    A class that continues over multiple periods becomes one event
+
+    Parameters:
+        schedule (Iterable[ScheduledDay]): The days to make events for
+        uid_prefix (str): Used to make event uids unique, eg the student's username
+        stamp (datetime): The time the events were made (in utc)
+    Returns:
+        Iterator[str]: The folded content lines of the events
+    """
+    dtstamp = stamp.strftime("%Y%m%dT%H%M%SZ")
+
+    for scheduled in schedule:
+        if scheduled.day is None:
+            continue
+
+        day_date = datetime.strptime(scheduled.date, "%Y-%m-%d")
+        periods = scheduled.day.periods
+        for i, period in enumerate(periods):
+            if (rdata := parse_class_name(period.class_name)) is None:
+                continue
+            # the earlier period already has an event that covers this one
+            if i > 0 and periods[i - 1].class_name == period.class_name:
+                continue
+
+            end_index = i + 1
+            while (
+                end_index < len(periods)
+                and periods[end_index].class_name == period.class_name
+            ):
+                end_index += 1
+
+            start = day_date + _time_delta(period.period_time)
+            if end_index < len(periods):
+                end = day_date + _time_delta(periods[end_index].period_time)
+            else:
+                last_start = _time_delta(periods[end_index - 1].period_time)
+                end = day_date + last_start + DEFAULT_PERIOD_LENGTH
+
+            c, t, p = rdata
+            lines = [
+                "BEGIN:VEVENT",
+                f"UID:{escape_text(uid_prefix)}-{start.strftime('%Y%m%dT%H%M')}@kmrpp",
+                f"DTSTAMP:{dtstamp}",
+                f"DTSTART:{start.strftime('%Y%m%dT%H%M%S')}",
+                f"DTEND:{end.strftime('%Y%m%dT%H%M%S')}",
+                f"SUMMARY:{escape_text(c)}",
+            ]
+            if p:
+                lines.append(f"LOCATION:{escape_text(p)}")
+            if t:
+                lines.append(f"DESCRIPTION:{escape_text(f'Teacher: {t}')}")
+            lines.append("END:VEVENT")
+
+            for line in lines:
+                yield fold_line(line)
+
+
+def iter_ics(
+    schedule: Iterable[ScheduledDay], uid_prefix: str, name: str = "Timetable"
+) -> Iterator[str]:
+    """
+    Generate a whole iCalendar file for the schedule
+
+    Times are "floating" (no timezone) so calendar apps show them in local time
+
+    Parameters:
+        schedule (Iterable[ScheduledDay]): The days to make events for
+        uid_prefix (str): Used to make event uids unique, eg the student's username
+        name (str): The name of the calendar
+    Returns:
+        Iterator[str]: The folded content lines of the file
+    """
+    yield fold_line("BEGIN:VCALENDAR")
+    yield fold_line("VERSION:2.0")
+    yield fold_line("PRODID:-//kmrpp//Parent Portal Timetable//EN")
+    yield fold_line("CALSCALE:GREGORIAN")
+    yield fold_line(f"X-WR-CALNAME:{escape_text(name)}")
+    yield from iter_ics_events(schedule, uid_prefix, datetime.now(timezone.utc))
+    yield fold_line("END:VCALENDAR")
+
+
+def write_ics(
+    path: str,
+    schedule: Iterable[ScheduledDay],
+    uid_prefix: str,
+    name: str = "Timetable",
+) -> None:
+    """
+    Stream the schedule to an iCalendar file
+    """
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        f.writelines(iter_ics(schedule, uid_prefix, name))
+
+
+def _time_delta(period_time: str) -> timedelta:
+    hours, minutes = period_time.split(":")
+    return timedelta(hours=int(hours), minutes=int(minutes))
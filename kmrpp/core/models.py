@@ -3,6 +3,7 @@ This module contains models that are used to handle data
 """
 
 from enum import Enum
+from typing import Optional
 
 from pydantic import BaseModel
 
@@ -57,3 +58,26 @@ class Weekdays(Enum):
     Wednesday = "Wednesday"
     Thursday = "Thursday"
     Friday = "Friday"
+
+
+class ScheduledDay(BaseModel):
+    """
+    A calendar date joined with its timetable
+
+    Attributes:
+        date (str): The date in the format YYYY-MM-DD
+        weekday (str): The weekday name eg "Monday"
+        week (Optional[int]): The timetable week, None if the date is not in a timetable week
+        term (Optional[str]): The term the date is in
+        term_week (Optional[str]): The week of the term
+        status (Optional[str]): The calendar status of the date
+        day (Optional[Day]): The timetable for the date, None if there is no school
+    """
+
+    date: str
+    weekday: str
+    week: Optional[int]
+    term: Optional[str]
+    term_week: Optional[str]
+    status: Optional[str]
+    day: Optional[Day]
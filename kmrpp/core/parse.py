@@ -7,6 +7,7 @@ import os
 import json
 from itertools import cycle
 from datetime import datetime
+from typing import Iterable, Optional
 import xml.etree.ElementTree as ET
 
 from rich import box
@@ -15,7 +16,8 @@ from rich.table import Table
 from rich.progress import track
 
 from kmrpp.core.consts import CACHE_DIR
-from kmrpp.core.models import Week, Day, Period
+from kmrpp.core.store import write_timetable_store
+from kmrpp.core.models import Week, Day, Period, ScheduledDay
 
 
 def parse_periods(start_times: ET.Element) -> list[list[str]]:
@@ -28,10 +30,32 @@ def parse_periods(start_times: ET.Element) -> list[list[str]]:
     return [[period.text for period in day] for day in start_times]
 
 
-def parse_timetable(timetable_data: ET.Element, period_data: ET.Element) -> list[Week]:
+def parse_class_name(class_name: str) -> Optional[tuple[str, str, str]]:
     """
-    This function parses the xml timetable and period data into a list of Week objects
-    It also converts the data into json which is stored in the cache dir
+    This function splits a timetable cell into its class, teacher and room
+    eg "1-1-MAT-ABC-R1" -> ("MAT", "ABC", "R1")
+
+    The room keeps any extra dashes, and if the cell isn't in the expected format
+    the whole cell is used as the class so one odd cell doesn't break everything
+
+    Returns:
+        Optional[tuple[str, str, str]]: The class, teacher and room or None if there is no class
+    """
+    rdata = class_name.split("-", 4)[2:]
+    if not rdata:
+        return None
+    if len(rdata) != 3:
+        return class_name, "", ""
+    c, t, p = rdata
+    return c, t, p
+
+
+def timetable_to_weeks(
+    timetable_data: ET.Element, period_data: ET.Element
+) -> list[Week]:
+    """
+    This function converts the xml timetable and period data into a list of Week objects
+    Unlike parse_timetable nothing is saved to the cache
 
     Returns:
         list[Week]: A list of week objects
@@ -46,10 +70,9 @@ def parse_timetable(timetable_data: ET.Element, period_data: ET.Element) -> list
         weeks_list.append(days)
 
     weeks: list[Week] = []
-    weeks_json = {}
 
     week_counter = 1
-    for week in track(weeks_list, description="Converting Weeks..."):
+    for week in weeks_list:
         day_names = cycle(["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"])
         days_list: dict[str, Day] = {}
         for day in week:
@@ -68,23 +91,53 @@ def parse_timetable(timetable_data: ET.Element, period_data: ET.Element) -> list
             )
             days_list[weekday] = day
 
-        week = Week(week_number=week_counter, days=days_list)
-        weeks.append(week)
-        weeks_json[f"W{week_counter}"] = json.loads(week.json())
+        weeks.append(Week(week_number=week_counter, days=days_list))
         week_counter += 1
 
-    with open(os.path.join(CACHE_DIR, "timetable.json"), "w") as f:
+    return weeks
+
+
+def parse_timetable(
+    timetable_data: ET.Element,
+    period_data: ET.Element,
+    cache_dir: Optional[str] = None,
+) -> list[Week]:
+    """
+    This function parses the xml timetable and period data into a list of Week objects
+    It also converts the data into json (and a binary store that can be memory mapped)
+    which are stored in the cache dir
+
+    Parameters:
+        cache_dir (Optional[str]): The cache partition to save the json/store to,
+            eg ParentPortal.cache_dir(year, grid) so years/grids are kept separate
+            if not given it is saved in the root of the cache dir
+    Returns:
+        list[Week]: A list of week objects
+    """
+    cache_dir = CACHE_DIR if cache_dir is None else cache_dir
+    weeks = timetable_to_weeks(timetable_data, period_data)
+
+    weeks_json = {}
+    for week in track(weeks, description="Converting Weeks..."):
+        weeks_json[f"W{week.week_number}"] = json.loads(week.json())
+
+    with open(os.path.join(cache_dir, "timetable.json"), "w") as f:
         print("[b green]✓ Timetable saved as JSON")
         json.dump(weeks_json, f, indent=4)
+    write_timetable_store(weeks_json, os.path.join(cache_dir, "timetable.bin"))
 
     return weeks
 
 
-def timetable_to_table(week_data: dict, week: int, dates: list[str]) -> Table:
+def timetable_to_table(week_data: dict, week: int, dates: dict[str, str]) -> Table:
     """
     This function converts json data about the weeks timetable to a table
     This table will be rendered by rich to the terminal
 
+    Parameters:
+        dates (dict[str, str]): The date for each weekday eg {"Monday": "2023-02-06"}
+            weekdays that aren't in the dict (eg before term starts) are shown without a date
+
     Returns:
         rich.Table: The table object
     """
@@ -94,8 +147,11 @@ def timetable_to_table(week_data: dict, week: int, dates: list[str]) -> Table:
         title=f"[bold blue]Timetable - Week: {week}", box=box.HEAVY, show_lines=True
     )
     table.add_column("Time")
-    for dayname, date in zip(weekdays, dates):
-        table.add_column(f"{dayname} ({'/'.join(date.split('-')[1:][::-1])})")
+    for dayname in weekdays:
+        if (date := dates.get(dayname)) is None:
+            table.add_column(dayname)
+        else:
+            table.add_column(f"{dayname} ({'/'.join(date.split('-')[1:][::-1])})")
 
     times = []
     colors = cycle(
@@ -148,10 +204,53 @@ def timetable_to_table(week_data: dict, week: int, dates: list[str]) -> Table:
     return table
 
 
-def parse_calendar(calendar_data: ET.Element) -> None:
+def schedule_to_table(schedule: Iterable[ScheduledDay], title: str) -> Table:
+    """
+    This function converts the schedule for a range of dates to a table
+    Only dates that have a timetable (school days) get a row
+
+    Returns:
+        rich.Table: The table object
+    """
+    table = Table(title=f"[bold blue]{title}", box=box.HEAVY, show_lines=True)
+    table.add_column("Date")
+    table.add_column("Week")
+    table.add_column("Term")
+    table.add_column("Classes")
+
+    for scheduled in schedule:
+        if scheduled.day is None:
+            continue
+
+        classes = []
+        for period in scheduled.day.periods:
+            if (rdata := parse_class_name(period.class_name)) is not None:
+                details = " - ".join(part for part in rdata if part)
+                classes.append(f"{period.period_time} {details}")
+
+        day_date = "/".join(scheduled.date.split("-")[1:][::-1])
+        table.add_row(
+            f"{scheduled.weekday} ({day_date})",
+            str(scheduled.week),
+            f"T{scheduled.term} W{scheduled.term_week}",
+            "\n".join(classes),
+        )
+
+    return table
+
+
+def parse_calendar(calendar_data: ET.Element, cache_dir: Optional[str] = None) -> dict:
     """
     This function parses the calendar and saves it as JSON in the cache dir
+
+    Parameters:
+        cache_dir (Optional[str]): The cache partition to save the json to,
+            eg ParentPortal.cache_dir(year) so years are kept separate
+            if not given it is saved in the root of the cache dir
+    Returns:
+        dict: The parsed calendar data
     """
+    cache_dir = CACHE_DIR if cache_dir is None else cache_dir
     data = {"days": {}, "weeks": {}}
 
     for day in calendar_data:
@@ -179,7 +278,7 @@ def parse_calendar(calendar_data: ET.Element) -> None:
             }
         )
 
-    with open(os.path.join(CACHE_DIR, "calendar.json"), "w") as f:
+    with open(os.path.join(cache_dir, "calendar.json"), "w") as f:
         print("[b green]✓ Calendar saved as JSON")
         json.dump(data, f, indent=4)
 
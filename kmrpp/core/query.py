@@ -0,0 +1,167 @@
+""" (module) query
+This module contains the ScheduleIndex class which joins the calendar and timetable
+so that the schedule for any date or range of dates can be looked up
+"""
+
+from bisect import bisect_left, bisect_right
+from datetime import date, timedelta
+from typing import Iterator, Optional, Union
+
+from kmrpp.core.store import TimetableStore
+from kmrpp.core.models import Day, ScheduledDay
+
+# calendar statuses (lower case) for days that are in a term week but have no classes
+CLOSED_STATUSES = ("holiday", "teacher only", "closed", "no school")
+
+WEEKDAYS = [
+    "Monday",
+    "Tuesday",
+    "Wednesday",
+    "Thursday",
+    "Friday",
+    "Saturday",
+    "Sunday",
+]
+
+
+class ScheduleIndex:
+    """
+    An index over a year's calendar and timetable
+
+    The calendar dates are sorted once so a range can be found with a binary search,
+    and each timetable day is only decoded/parsed the first time it is needed
+    so querying a whole term doesn't redo work for every date
+
+    Example:
+        index = ScheduleIndex(store, calendar_data)
+        for scheduled in index.iter_range(date(2023, 2, 1), date(2023, 4, 14)):
+            print(scheduled.date, scheduled.day)
+    """
+
+    def __init__(
+        self, timetable: Union[dict, TimetableStore], calendar_data: dict
+    ) -> None:
+        """
+        Parameters:
+            timetable (Union[dict, TimetableStore]): The timetable json data or a timetable store
+            calendar_data (dict): The calendar data made by parse_calendar
+        """
+        self.timetable = timetable
+        self.calendar_days: dict[str, dict] = calendar_data["days"]
+        self.dates = sorted(self.calendar_days)
+
+        # the date of each weekday in a timetable week eg {5: {"Monday": "2023-02-27"}}
+        self.week_dates: dict[int, dict[str, str]] = {}
+        for day_date in self.dates:
+            if (week := self.calendar_days[day_date].get("week")) is None:
+                continue
+            weekday = WEEKDAYS[date.fromisoformat(day_date).weekday()]
+            self.week_dates.setdefault(int(week), {})[weekday] = day_date
+
+        self._weeks: dict[int, Optional[dict]] = {}
+        self._days: dict[tuple[int, str], Optional[Day]] = {}
+
+    def day(self, week: int, weekday: str) -> Optional[Day]:
+        """
+        Get the timetable for a weekday in a timetable week
+
+        Returns:
+            Optional[Day]: The Day object or None if there is no timetable for that day
+        """
+        key = (week, weekday)
+        if key not in self._days:
+            week_data = self._week(week)
+            day_data = None if week_data is None else week_data["days"].get(weekday)
+            self._days[key] = None if day_data is None else Day(**day_data)
+        return self._days[key]
+
+    def get(self, day_date: date) -> Optional[ScheduledDay]:
+        """
+        Get the schedule for a single date
+
+        Returns:
+            Optional[ScheduledDay]: The schedule or None if the date is not in the calendar
+        """
+        if (calendar_day := self.calendar_days.get(day_date.isoformat())) is None:
+            return None
+        return self._schedule(day_date.isoformat(), calendar_day)
+
+    def iter_range(self, start: date, end: date) -> Iterator[ScheduledDay]:
+        """
+        Lazily get the schedule for every date from start to end (inclusive)
+        Dates that are not in the calendar are skipped
+
+        Returns:
+            Iterator[ScheduledDay]: The schedule for each date in order
+        """
+        first = bisect_left(self.dates, start.isoformat())
+        last = bisect_right(self.dates, end.isoformat())
+        for i in range(first, last):
+            day_date = self.dates[i]
+            yield self._schedule(day_date, self.calendar_days[day_date])
+
+    def range(self, start: date, end: date) -> list[ScheduledDay]:
+        """
+        Get the schedule for every date from start to end (inclusive)
+
+        Returns:
+            list[ScheduledDay]: The schedule for each date in order
+        """
+        return list(self.iter_range(start, end))
+
+    def upcoming(self, days: int, start: Optional[date] = None) -> list[ScheduledDay]:
+        """
+        Get the schedule for the next few days
+
+        Parameters:
+            days (int): The number of days to get, including the start date
+            start (Optional[date]): The date to start from, defaults to today
+        Returns:
+            list[ScheduledDay]: The schedule for each date in order
+        """
+        start = date.today() if start is None else start
+        return self.range(start, start + timedelta(days=days - 1))
+
+    def _week(self, week: int) -> Optional[dict]:
+        if week not in self._weeks:
+            if isinstance(self.timetable, TimetableStore):
+                self._weeks[week] = self.timetable.week(week)
+            else:
+                self._weeks[week] = self.timetable.get(f"W{week}")
+        return self._weeks[week]
+
+    def _schedule(self, day_date: str, calendar_day: dict) -> ScheduledDay:
+        weekday = WEEKDAYS[date.fromisoformat(day_date).weekday()]
+        week = calendar_day.get("week")
+        week = None if week is None else int(week)
+        status = calendar_day.get("status")
+
+        # holidays/teacher only days can be in a term week but have no timetable day
+        school_day = (
+            week is not None
+            and calendar_day.get("weekday") is not None
+            and not is_closed(status)
+        )
+
+        return ScheduledDay(
+            date=day_date,
+            weekday=weekday,
+            week=week,
+            term=calendar_day.get("term"),
+            term_week=calendar_day.get("term_week"),
+            status=status,
+            day=self.day(week, weekday) if school_day else None,
+        )
+
+
+def is_closed(status: Optional[str]) -> bool:
+    """
+    Check if a calendar status means the school is closed that day
+
+    Returns:
+        bool: True if there are no classes that day
+    """
+    if status is None:
+        return False
+    status = status.lower()
+    return any(closed in status for closed in CLOSED_STATUSES)
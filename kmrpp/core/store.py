@@ -0,0 +1,254 @@
+""" (module) store
+This module contains a binary timetable cache that can be read with mmap
+
+The json cache has to be read and decoded entirely even if only one week is needed.
+This store has a fixed layout so a week/day can be found by offset and only the
+pages that are needed get read. Because the file is mapped read only, processes that
+open the same store share the OS page cache instead of each holding a decoded copy.
+
+Layout (all integers are little endian):
+    header:       magic, version, week count, day count, period count, string count,
+                  string data size
+    week table:   week number, day count, index of first day         (sorted by week number)
+    day table:    name, start, end, period count, index of first period
+    period table: period time, class name
+    string table: (offset, length) for each string, then the utf-8 string data
+
+Every string field in the tables is an index into the string table.
+Strings are deduplicated so repeated class names and times are only stored once.
+"""
+
+import os
+import mmap
+import struct
+from typing import Optional
+
+from kmrpp.core.exceptions import InvalidCacheFile
+
+MAGIC = b"KMRT"
+VERSION = 2
+
+HEADER = struct.Struct("<4sHHIIII")
+WEEK = struct.Struct("<HHI")
+DAY = struct.Struct("<IIIII")
+PERIOD = struct.Struct("<II")
+STRING = struct.Struct("<II")
+
+
+def write_timetable_store(weeks_json: dict, path: str) -> None:
+    """
+    This function writes timetable json data (as made by parse_timetable) to a binary store
+
+    The file is written to a temp file and then moved into place.
+    On POSIX systems processes that already have the old store mapped keep reading the old file,
+    on Windows the move fails with a PermissionError while another process has it mapped
+    """
+    strings: dict[str, int] = {}
+
+    def string_id(value: str) -> int:
+        if value not in strings:
+            strings[value] = len(strings)
+        return strings[value]
+
+    weeks = sorted(weeks_json.values(), key=lambda week: week["week_number"])
+    week_rows: list[bytes] = []
+    day_rows: list[bytes] = []
+    period_rows: list[bytes] = []
+
+    for week in weeks:
+        week_rows.append(
+            WEEK.pack(week["week_number"], len(week["days"]), len(day_rows))
+        )
+        for day in week["days"].values():
+            day_rows.append(
+                DAY.pack(
+                    string_id(day["name"]),
+                    string_id(day["start"]),
+                    string_id(day["end"]),
+                    len(day["periods"]),
+                    len(period_rows),
+                )
+            )
+            for period in day["periods"]:
+                period_rows.append(
+                    PERIOD.pack(
+                        string_id(period["period_time"]),
+                        string_id(period["class_name"]),
+                    )
+                )
+
+    string_rows: list[bytes] = []
+    string_data: list[bytes] = []
+    offset = 0
+    for value in strings:
+        encoded = value.encode()
+        string_rows.append(STRING.pack(offset, len(encoded)))
+        string_data.append(encoded)
+        offset += len(encoded)
+
+    header = HEADER.pack(
+        MAGIC,
+        VERSION,
+        len(week_rows),
+        len(day_rows),
+        len(period_rows),
+        len(strings),
+        offset,
+    )
+
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(temp_path, "wb") as f:
+            f.write(header)
+            for rows in (week_rows, day_rows, period_rows, string_rows, string_data):
+                f.write(b"".join(rows))
+        os.replace(temp_path, path)
+    finally:
+        # only exists here if writing or moving it failed
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+class TimetableStore:
+    """
+    A read only, memory mapped view of a binary timetable store
+
+    The dicts returned are in the same format as the json cache so the two can be used interchangeably
+
+    Example:
+        with TimetableStore(path) as store:
+            week_data = store.week(3)
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size < HEADER.size:
+                raise InvalidCacheFile(path)
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+
+        (
+            magic,
+            version,
+            week_count,
+            day_count,
+            period_count,
+            string_count,
+            string_data_size,
+        ) = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise InvalidCacheFile(path)
+
+        self.week_count = week_count
+        self._weeks_offset = HEADER.size
+        self._days_offset = self._weeks_offset + week_count * WEEK.size
+        self._periods_offset = self._days_offset + day_count * DAY.size
+        self._strings_offset = self._periods_offset + period_count * PERIOD.size
+        self._string_data_offset = self._strings_offset + string_count * STRING.size
+
+        # catches truncated files as well as the tables not matching the header
+        if self._string_data_offset + string_data_size != len(self._mmap):
+            self.close()
+            raise InvalidCacheFile(path)
+
+    def __enter__(self) -> "TimetableStore":
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Unmap the store, dicts that were already returned are still usable"""
+        self._view.release()
+        self._mmap.close()
+
+    def week_numbers(self) -> list[int]:
+        """
+        Get the week numbers that are in the store
+
+        Returns:
+            list[int]: The week numbers in ascending order
+        """
+        return [self._week_row(i)[0] for i in range(self.week_count)]
+
+    def week(self, week_number: int) -> Optional[dict]:
+        """
+        Get a week's timetable
+
+        Returns:
+            Optional[dict]: The week data or None if the week is not in the store
+        """
+        if (row := self._find_week(week_number)) is None:
+            return None
+
+        _, day_count, first_day = row
+        days = {}
+        for i in range(first_day, first_day + day_count):
+            day = self._day(i)
+            days[day["name"]] = day
+        return {"week_number": week_number, "days": days}
+
+    def day(self, week_number: int, name: str) -> Optional[dict]:
+        """
+        Get a single day from a week's timetable
+
+        Returns:
+            Optional[dict]: The day data or None if the week/day is not in the store
+        """
+        if (row := self._find_week(week_number)) is None:
+            return None
+
+        _, day_count, first_day = row
+        for i in range(first_day, first_day + day_count):
+            name_id = DAY.unpack_from(self._mmap, self._days_offset + i * DAY.size)[0]
+            if self._string(name_id) == name:
+                return self._day(i)
+        return None
+
+    def _week_row(self, index: int) -> tuple[int, int, int]:
+        return WEEK.unpack_from(self._mmap, self._weeks_offset + index * WEEK.size)
+
+    def _find_week(self, week_number: int) -> Optional[tuple[int, int, int]]:
+        # binary search over the week table so only the pages we land on are read
+        low, high = 0, self.week_count - 1
+        while low <= high:
+            middle = (low + high) // 2
+            row = self._week_row(middle)
+            if row[0] == week_number:
+                return row
+            if row[0] < week_number:
+                low = middle + 1
+            else:
+                high = middle - 1
+        return None
+
+    def _day(self, index: int) -> dict:
+        name, start, end, period_count, first_period = DAY.unpack_from(
+            self._mmap, self._days_offset + index * DAY.size
+        )
+        periods = []
+        for i in range(first_period, first_period + period_count):
+            period_time, class_name = PERIOD.unpack_from(
+                self._mmap, self._periods_offset + i * PERIOD.size
+            )
+            periods.append(
+                {
+                    "period_time": self._string(period_time),
+                    "class_name": self._string(class_name),
+                }
+            )
+        return {
+            "name": self._string(name),
+            "start": self._string(start),
+            "end": self._string(end),
+            "periods": periods,
+        }
+
+    def _string(self, index: int) -> str:
+        offset, length = STRING.unpack_from(
+            self._mmap, self._strings_offset + index * STRING.size
+        )
+        start = self._string_data_offset + offset
+        return str(self._view[start : start + length], "utf-8")
@@ -0,0 +1,108 @@
+""" (module) synthetic
+This module makes fake api xml data in the same shape as parent portal returns
+so that the parse/render functions can be tested and benchmarked without logging in
+"""
+
+import random
+from datetime import date, timedelta
+import xml.etree.ElementTree as ET
+
+SUBJECTS = ["MAT", "ENG", "SCI", "PHY", "CHE", "BIO", "HIS", "GEO", "ART", "PED"]
+TEACHERS = ["ABC", "DEF", "GHI", "JKL", "MNO", "PQR", "STU", "VWX"]
+ROOMS = ["R1", "R2", "R3", "L1", "L2", "G1", "A4", "B12"]
+
+
+def period_times(periods: int) -> list[str]:
+    """
+    Make evenly spaced period start times from 8:45
+
+    Returns:
+        list[str]: The start times in the format HH:MM
+    """
+    start = 8 * 60 + 45
+    length = max(10, (15 * 60 + 15 - start) // periods)
+    return [
+        f"{(start + i * length) // 60:02}:{(start + i * length) % 60:02}"
+        for i in range(periods)
+    ]
+
+
+def period_data(periods: int = 9, days: int = 5) -> ET.Element:
+    """
+    Make the StartTimes element returned by the GetGlobals command
+
+    Returns:
+        xml.etree.ElementTree.Element: The period start times for each day
+    """
+    start_times = ET.Element("StartTimes")
+    for _ in range(days):
+        day = ET.SubElement(start_times, "Day")
+        for period_time in period_times(periods):
+            ET.SubElement(day, "PeriodTime").text = period_time
+    return start_times
+
+
+def timetable_data(
+    weeks: int = 40, periods: int = 9, days: int = 5, seed: int = 0
+) -> ET.Element:
+    """
+    Make the TimetableData element returned by the GetStudentTimetable command
+    About a quarter of periods are left empty (breaks, free periods etc.)
+
+    Returns:
+        xml.etree.ElementTree.Element: The timetable for each week
+    """
+    rng = random.Random(seed)
+    # a student takes the same few classes all year
+    classes = [
+        f"1-{i}-{subject}-{rng.choice(TEACHERS)}-{rng.choice(ROOMS)}"
+        for i, subject in enumerate(rng.sample(SUBJECTS, 6))
+    ]
+
+    timetable = ET.Element("TimetableData")
+    # parse_timetable skips the first 3 elements
+    for tag in ("Grid", "Student", "Year"):
+        ET.SubElement(timetable, tag)
+
+    for week in range(1, weeks + 1):
+        week_element = ET.SubElement(timetable, f"W{week}")
+        for day in range(1, days + 1):
+            cells = [
+                "" if rng.random() < 0.25 else rng.choice(classes)
+                for _ in range(periods)
+            ]
+            ET.SubElement(week_element, f"D{day}").text = "|" + "|".join(cells) + "|"
+    return timetable
+
+
+def calendar_data(year: int = 2023, years: int = 1) -> ET.Element:
+    """
+    Make the Days element returned by the GetCalendar command
+    Weeks start on a monday and term time is roughly Feb to mid Dec
+
+    Returns:
+        xml.etree.ElementTree.Element: A Day element for each date
+    """
+    days = ET.Element("Days")
+    day_date = date(year, 1, 1)
+    end = date(year + years, 1, 1)
+
+    while day_date < end:
+        school_year_start = date(day_date.year, 2, 1)
+        first_monday = school_year_start - timedelta(days=school_year_start.weekday())
+        in_term = school_year_start <= day_date <= date(day_date.year, 12, 15)
+        week = (day_date - first_monday).days // 7 + 1
+        term = min(4, (day_date.month - 2) // 3 + 1)
+
+        day = ET.SubElement(days, "Day")
+        ET.SubElement(day, "Date").text = day_date.isoformat()
+        ET.SubElement(day, "Status").text = None
+        ET.SubElement(day, "WeekYear").text = str(week) if in_term else None
+        ET.SubElement(day, "Term").text = str(term) if in_term else None
+        ET.SubElement(day, "DayTT").text = (
+            str(day_date.weekday() + 1) if in_term and day_date.weekday() < 5 else None
+        )
+        ET.SubElement(day, "Week").text = str(week % 10 or 10) if in_term else None
+
+        day_date += timedelta(days=1)
+    return days
@@ -0,0 +1,76 @@
+import os
+from types import SimpleNamespace
+
+import pytest
+
+from kmrpp.core import consts, http
+from kmrpp.core.http import ParentPortal, Singleton
+
+TIMETABLE_RESPONSE = (
+    "<StudentTimetableResults><Students><Student>"
+    "<TimetableData><W1><D1>|a|</D1></W1></TimetableData>"
+    "</Student></Students></StudentTimetableResults>"
+)
+CALENDAR_RESPONSE = "<CalendarResults><Days><Day/></Days></CalendarResults>"
+ERROR_RESPONSE = "<Error><Error>Invalid grid</Error></Error>"
+
+
+@pytest.fixture
+def portal(tmp_path, monkeypatch):
+    monkeypatch.setattr(consts, "CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(Singleton, "_instances", {})
+    return ParentPortal("student", "password", key="key")
+
+
+def stub_post(monkeypatch, text: str) -> list[dict]:
+    requests_made = []
+
+    def post(url, headers, data):
+        requests_made.append(data)
+        return SimpleNamespace(status_code=200, text=text)
+
+    monkeypatch.setattr(http.requests, "post", post)
+    return requests_made
+
+
+def test_years_are_cached_separately(portal, monkeypatch, tmp_path):
+    requests_made = stub_post(monkeypatch, TIMETABLE_RESPONSE)
+
+    portal.timetable(use_cache=False, year=2022)
+    portal.timetable(use_cache=False, year=2023, grid="2023SEM")
+
+    assert [data["Grid"] for data in requests_made] == ["2022TT", "2023SEM"]
+    assert os.path.exists(tmp_path / "student" / "2022" / "2022TT" / "timetable.xml")
+    assert os.path.exists(tmp_path / "student" / "2023" / "2023SEM" / "timetable.xml")
+
+
+def test_cached_year_is_not_refetched(portal, monkeypatch):
+    requests_made = stub_post(monkeypatch, CALENDAR_RESPONSE)
+
+    portal.calendar(year=2022)
+    portal.calendar(year=2022)
+    portal.calendar(year=2023)
+
+    assert [data["Year"] for data in requests_made] == [2022, 2023]
+
+
+def test_error_response_is_not_cached(portal, monkeypatch, tmp_path):
+    stub_post(monkeypatch, ERROR_RESPONSE)
+
+    with pytest.raises(SystemExit):
+        portal.timetable(use_cache=False, year=1999)
+
+    assert not os.path.exists(
+        tmp_path / "student" / "1999" / "1999TT" / "timetable.xml"
+    )
+
+
+@pytest.mark.parametrize("grid", ["../../x", "..", "a/b", ""])
+def test_grid_cannot_leave_cache_dir(portal, monkeypatch, tmp_path, grid):
+    requests_made = stub_post(monkeypatch, TIMETABLE_RESPONSE)
+
+    with pytest.raises(SystemExit):
+        portal.timetable(use_cache=False, year=2023, grid=grid)
+
+    assert requests_made == []
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,77 @@
+from datetime import date, datetime
+
+from kmrpp.core.query import ScheduleIndex
+from kmrpp.core.ics import iter_ics_events
+
+PERIODS = [
+    {"period_time": "13:00", "class_name": ""},
+    {"period_time": "14:00", "class_name": "1-1-MAT-ABC-R1"},
+    {"period_time": "15:00", "class_name": "1-1-MAT-ABC-R1"},
+]
+DAY = {"name": "Monday", "start": "13:00", "end": "15:00", "periods": PERIODS}
+TIMETABLE = {"W1": {"week_number": 1, "days": {"Monday": DAY}}}
+
+
+def calendar_day(weekday, status=None) -> dict:
+    return {
+        "status": status,
+        "week": "1",
+        "term": "1",
+        "weekday": weekday,
+        "term_week": "1",
+    }
+
+
+def event_times(calendar_data: dict) -> list[str]:
+    index = ScheduleIndex(TIMETABLE, calendar_data)
+    schedule = index.iter_range(date(2023, 1, 1), date(2023, 12, 31))
+    return [
+        line.strip()
+        for line in iter_ics_events(schedule, "test", datetime(2023, 1, 1))
+        if line.startswith(("DTSTART", "DTEND"))
+    ]
+
+
+def test_double_period_at_end_of_day():
+    calendar_data = {"days": {"2023-02-06": calendar_day("1")}}
+
+    assert event_times(calendar_data) == [
+        "DTSTART:20230206T140000",
+        "DTEND:20230206T160000",
+    ]
+
+
+def test_no_events_on_closed_days():
+    calendar_data = {
+        "days": {
+            "2023-02-06": calendar_day(None, "Waitangi Day"),
+            "2023-02-13": calendar_day("1", "Teacher Only Day"),
+        }
+    }
+
+    assert event_times(calendar_data) == []
+
+
+def test_odd_class_names_dont_break_export():
+    periods = [
+        {"period_time": "09:00", "class_name": "1-1-MAT-ABC-R1-A"},
+        {"period_time": "10:00", "class_name": "1-1-ODD"},
+        {"period_time": "11:00", "class_name": ""},
+    ]
+    day = {"name": "Monday", "start": "09:00", "end": "11:00", "periods": periods}
+    timetable = {"W1": {"week_number": 1, "days": {"Monday": day}}}
+    index = ScheduleIndex(timetable, {"days": {"2023-02-06": calendar_day("1")}})
+
+    schedule = index.iter_range(date(2023, 2, 6), date(2023, 2, 6))
+    lines = [
+        line.strip()
+        for line in iter_ics_events(schedule, "test", datetime(2023, 1, 1))
+        if line.startswith(("SUMMARY", "LOCATION", "DESCRIPTION"))
+    ]
+
+    assert lines == [
+        "SUMMARY:MAT",
+        "LOCATION:R1-A",
+        "DESCRIPTION:Teacher: ABC",
+        "SUMMARY:1-1-ODD",
+    ]
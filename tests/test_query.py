@@ -0,0 +1,71 @@
+import json
+from datetime import date
+
+import pytest
+
+import synthetic
+from kmrpp.core.query import ScheduleIndex
+from kmrpp.core.parse import parse_timetable, parse_calendar
+
+
+@pytest.fixture
+def calendar_data(tmp_path) -> dict:
+    # term 1 of 2023 starts on Wednesday the 1st of February
+    return parse_calendar(synthetic.calendar_data(2023), str(tmp_path))
+
+
+@pytest.fixture
+def timetable_data(tmp_path) -> dict:
+    parse_timetable(synthetic.timetable_data(), synthetic.period_data(), str(tmp_path))
+    with open(tmp_path / "timetable.json") as f:
+        return json.load(f)
+
+
+def test_week_dates_for_partial_week(timetable_data, calendar_data):
+    index = ScheduleIndex(timetable_data, calendar_data)
+
+    week_dates = index.week_dates[1]
+    assert "Monday" not in week_dates
+    assert "Tuesday" not in week_dates
+    assert week_dates["Wednesday"] == "2023-02-01"
+    assert week_dates["Thursday"] == "2023-02-02"
+    assert week_dates["Friday"] == "2023-02-03"
+    assert index.week_dates[2]["Monday"] == "2023-02-06"
+
+
+def test_range_is_inclusive(timetable_data, calendar_data):
+    index = ScheduleIndex(timetable_data, calendar_data)
+
+    schedule = index.range(date(2023, 2, 6), date(2023, 2, 10))
+    assert [scheduled.date for scheduled in schedule] == [
+        "2023-02-06",
+        "2023-02-07",
+        "2023-02-08",
+        "2023-02-09",
+        "2023-02-10",
+    ]
+    assert list(index.iter_range(date(2023, 2, 6), date(2023, 2, 10))) == schedule
+    assert index.range(date(2023, 12, 31), date(2024, 1, 5))[-1].date == "2023-12-31"
+    assert index.range(date(2024, 1, 1), date(2024, 1, 5)) == []
+
+
+def test_upcoming_one_day(timetable_data, calendar_data):
+    index = ScheduleIndex(timetable_data, calendar_data)
+
+    (scheduled,) = index.upcoming(days=1, start=date(2023, 2, 7))
+    assert scheduled.date == "2023-02-07"
+    assert scheduled.weekday == "Tuesday"
+    assert scheduled.week == 2
+    assert scheduled.day.name == "Tuesday"
+    assert scheduled.day.dict() == timetable_data["W2"]["days"]["Tuesday"]
+
+
+def test_closed_days_have_no_timetable(timetable_data, calendar_data):
+    calendar_data["days"]["2023-02-06"]["status"] = "Waitangi Day - Public Holiday"
+    calendar_data["days"]["2023-02-07"]["weekday"] = None
+    index = ScheduleIndex(timetable_data, calendar_data)
+
+    assert index.get(date(2023, 2, 6)).day is None
+    assert index.get(date(2023, 2, 7)).day is None
+    assert index.get(date(2023, 2, 8)).day is not None
+    assert index.get(date(2023, 2, 11)).day is None  # weekend
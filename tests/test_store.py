@@ -0,0 +1,49 @@
+import os
+import json
+
+import pytest
+
+import synthetic
+from kmrpp.core.parse import parse_timetable
+from kmrpp.core.exceptions import InvalidCacheFile
+from kmrpp.core.store import TimetableStore, write_timetable_store
+
+
+def make_timetable(tmp_path) -> dict:
+    timetable_data = synthetic.timetable_data(weeks=40)
+    # make sure multi byte strings survive the string table
+    timetable_data.find("W1")[0].text = "|" + "|".join(["1-1-MAT-ĀĒĪ-R1"] * 9) + "|"
+
+    parse_timetable(timetable_data, synthetic.period_data(), str(tmp_path))
+    with open(tmp_path / "timetable.json") as f:
+        return json.load(f)
+
+
+def test_round_trip(tmp_path):
+    weeks_json = make_timetable(tmp_path)
+
+    with TimetableStore(str(tmp_path / "timetable.bin")) as store:
+        assert store.week_numbers() == list(range(1, 41))
+        for key, week_data in weeks_json.items():
+            week_number = int(key[1:])
+            assert store.week(week_number) == week_data
+            for name, day_data in week_data["days"].items():
+                assert store.day(week_number, name) == day_data
+        assert store.week(41) is None
+        assert store.day(1, "Saturday") is None
+
+
+def test_truncated_store_is_invalid(tmp_path):
+    make_timetable(tmp_path)
+    path = tmp_path / "timetable.bin"
+    path.write_bytes(path.read_bytes()[:-5])
+
+    with pytest.raises(InvalidCacheFile):
+        TimetableStore(str(path))
+
+
+def test_write_leaves_no_temp_file(tmp_path):
+    weeks_json = make_timetable(tmp_path)
+    write_timetable_store(weeks_json, str(tmp_path / "timetable.bin"))
+
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]